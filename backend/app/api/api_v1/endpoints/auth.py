@@ -3,27 +3,32 @@ from typing import Any
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import bindparam, lambda_stmt, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.base import get_db
 from app.core.config import settings
 from app.models.user import User
 from app.models.schemas.token import Token, RefreshToken
 from app.models.schemas.user import UserCreate, User as UserSchema
-from app.auth.jwt import create_access_token, create_refresh_token, verify_password, validate_token, get_password_hash
+from app.auth.jwt import create_access_token, create_refresh_token, verify_password_async, validate_token, get_password_hash_async
 
 router = APIRouter()
 
+# Hot-path user lookups, built and cached once instead of per request
+_user_by_email = lambda_stmt(lambda: select(User).where(User.email == bindparam("email")))
+_user_by_id = lambda_stmt(lambda: select(User).where(User.id == bindparam("user_id")))
+
 
 @router.post("/login", response_model=Token)
-def login(
-    db: Session = Depends(get_db), form_data: OAuth2PasswordRequestForm = Depends()
+async def login(
+    db: AsyncSession = Depends(get_db), form_data: OAuth2PasswordRequestForm = Depends()
 ) -> Any:
     """
     OAuth2 compatible token login, get an access token for future requests
     """
-    user = db.query(User).filter(User.email == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    user = (await db.execute(_user_by_email, {"email": form_data.username})).scalar_one_or_none()
+    if not user or not await verify_password_async(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -43,8 +48,8 @@ def login(
 
 
 @router.post("/refresh", response_model=Token)
-def refresh_token(
-    db: Session = Depends(get_db), refresh_token: RefreshToken = None
+async def refresh_token(
+    db: AsyncSession = Depends(get_db), refresh_token: RefreshToken = None
 ) -> Any:
     """
     Refresh token endpoint
@@ -63,7 +68,7 @@ def refresh_token(
             headers={"WWW-Authenticate": "Bearer"},
         )
         
-    user = db.query(User).filter(User.id == token_data.sub).first()
+    user = (await db.execute(_user_by_id, {"user_id": token_data.sub})).scalar_one_or_none()
     if not user or not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -81,29 +86,34 @@ def refresh_token(
 
 
 @router.post("/register", response_model=UserSchema)
-def register(
+async def register(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     user_in: UserCreate,
 ) -> Any:
     """
     Register a new user
     """
-    user = db.query(User).filter(User.email == user_in.email).first()
-    if user:
+    existing = (await db.execute(
+        select(User.email, User.username)
+        .where(or_(User.email == user_in.email, User.username == user_in.username))
+        # An email match wins so the error reported doesn't depend on row order
+        .order_by((User.email == user_in.email).desc())
+        .limit(1)
+    )).first()
+    if existing and existing.email == user_in.email:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="A user with this email already exists",
         )
         
-    user = db.query(User).filter(User.username == user_in.username).first()
-    if user:
+    if existing:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="A user with this username already exists",
         )
         
-    hashed_password = get_password_hash(user_in.password)
+    hashed_password = await get_password_hash_async(user_in.password)
     db_user = User(
         email=user_in.email,
         username=user_in.username,
@@ -113,7 +123,7 @@ def register(
     )
     
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     
     return db_user 
\ No newline at end of file
@@ -1,12 +1,16 @@
 from typing import Any, List, Dict, Optional
 
+import uuid
+
+import openai
 from fastapi import APIRouter, Depends, HTTPException, status, Body
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from app.db.base import get_db
 from app.models.user import User
 from app.auth.deps import get_current_active_user
-from app.services.llm_service import get_model_response, generate_forecast_code
+from app.services.llm_service import get_model_response, stream_model_response, generate_forecast_code
 
 router = APIRouter()
 
@@ -32,6 +36,44 @@ async def chat_message(
     return response
 
 
+@router.post("/message/stream")
+async def chat_message_stream(
+    *,
+    message: str = Body(..., embed=True),
+    conversation_id: Optional[str] = Body(None, embed=True),
+    context: Optional[Dict] = Body(None, embed=True),
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Send a message to the LLM and stream the response text as it is generated.
+    The conversation ID is returned in the X-Conversation-ID header. If the
+    stream fails after it has started, its last chunk is STREAM_ERROR_MARKER
+    followed by the error message.
+    """
+    if not conversation_id:
+        conversation_id = str(uuid.uuid4())
+    
+    # Open the stream before sending headers so API failures get an error status
+    try:
+        reply = await stream_model_response(
+            user_id=current_user.id,
+            message=message,
+            conversation_id=conversation_id,
+            context=context,
+        )
+    except openai.OpenAIError as e:
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail=f"Error calling OpenAI API: {str(e)}",
+        )
+    
+    return StreamingResponse(
+        reply,
+        media_type="text/plain; charset=utf-8",
+        headers={"X-Conversation-ID": conversation_id},
+    )
+
+
 @router.post("/generate-forecast", response_model=Dict)
 async def generate_forecast(
     *,
@@ -1,7 +1,9 @@
 from typing import Any, List, Dict, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile, Form
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, File, UploadFile, Form, Query
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.base import get_db
 from app.models.user import User
@@ -11,37 +13,46 @@ from app.models.schemas.data_source import (
     DataSourceCreate,
     DataSourceUpdate,
 )
+from app.models.schemas.page import Page
 from app.auth.deps import get_current_active_user
 from app.api.deps import get_data_source
-from app.services.data_importer import import_data, get_data_preview
+from app.services.data_importer import get_data_preview
+from app.services.import_jobs import create_import_job, get_import_job, get_import_job_rows, run_import_job
 
 router = APIRouter()
 
 
-@router.get("", response_model=List[DataSourceSchema])
-def list_data_sources(
-    db: Session = Depends(get_db),
+@router.get("", response_model=Page[DataSourceSchema])
+async def list_data_sources(
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
-    skip: int = 0,
-    limit: int = 100,
+    after_id: Optional[int] = None,
+    limit: int = Query(100, ge=1, le=1000),
     source_type: Optional[str] = None,
 ) -> Any:
     """
-    Retrieve data sources.
+    Retrieve data sources, paginated by ID. Pass the returned next_cursor as after_id for the next page.
     """
-    query = db.query(DataSource).filter(DataSource.owner_id == current_user.id)
+    # Select plain rows; the response model validates the mappings directly
+    query = select(DataSource.__table__).where(DataSource.owner_id == current_user.id)
     
     if source_type:
-        query = query.filter(DataSource.source_type == source_type)
+        query = query.where(DataSource.source_type == source_type)
     
-    sources = query.offset(skip).limit(limit).all()
-    return sources
+    if after_id is not None:
+        query = query.where(DataSource.id > after_id)
+    
+    sources = (await db.execute(query.order_by(DataSource.id).limit(limit))).mappings().all()
+    return {
+        "items": sources,
+        "next_cursor": sources[-1]["id"] if len(sources) == limit else None,
+    }
 
 
 @router.post("", response_model=DataSourceSchema)
-def create_data_source(
+async def create_data_source(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     source_in: DataSourceCreate,
     current_user: User = Depends(get_current_active_user),
 ) -> Any:
@@ -59,14 +70,14 @@ def create_data_source(
     )
     
     db.add(source)
-    db.commit()
-    db.refresh(source)
+    await db.commit()
+    await db.refresh(source)
     
     return source
 
 
 @router.get("/{source_id}", response_model=DataSourceSchema)
-def get_data_source_by_id(
+async def get_data_source_by_id(
     source: DataSource = Depends(get_data_source),
 ) -> Any:
     """
@@ -76,37 +87,42 @@ def get_data_source_by_id(
 
 
 @router.put("/{source_id}", response_model=DataSourceSchema)
-def update_data_source(
+async def update_data_source(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     source: DataSource = Depends(get_data_source),
     source_in: DataSourceUpdate,
 ) -> Any:
     """
     Update a data source.
     """
-    data_to_update = source_in.dict(exclude_unset=True)
-    for field, value in data_to_update.items():
-        setattr(source, field, value)
-    
-    db.add(source)
-    db.commit()
-    db.refresh(source)
+    data_to_update = source_in.model_dump(exclude_unset=True)
+    if data_to_update:
+        # Single UPDATE ... RETURNING; the default session sync plus populate_existing
+        # bring the loaded instance up to date with the returned row
+        source = (await db.execute(
+            update(DataSource)
+            .where(DataSource.id == source.id)
+            .values(**data_to_update)
+            .returning(DataSource)
+            .execution_options(populate_existing=True)
+        )).scalar_one()
+        await db.commit()
     
     return source
 
 
 @router.delete("/{source_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_data_source(
+async def delete_data_source(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     source: DataSource = Depends(get_data_source),
 ) -> Any:
     """
     Delete a data source.
     """
-    db.delete(source)
-    db.commit()
+    await db.delete(source)
+    await db.commit()
     return None
 
 
@@ -122,11 +138,13 @@ async def upload_file_data(
     """
     Upload a file as a data source.
     """
-    # Get file contents
-    contents = await file.read()
+    # Read straight from the spooled upload file instead of buffering it in memory
+    await file.seek(0)
     
-    # Process file based on type
-    preview, schema = get_data_preview(file.filename, contents, source_type)
+    # Process file based on type (blocking parse runs off the event loop)
+    preview, schema = await run_in_threadpool(
+        get_data_preview, file.filename, file.file, source_type
+    )
     
     # Return preview and schema for frontend to display before saving
     return {
@@ -139,19 +157,50 @@ async def upload_file_data(
     }
 
 
-@router.post("/{source_id}/import", response_model=Dict)
-def import_data_from_source(
+@router.post("/{source_id}/import", response_model=Dict, status_code=status.HTTP_202_ACCEPTED)
+async def import_data_from_source(
     *,
     source: DataSource = Depends(get_data_source),
+    background_tasks: BackgroundTasks,
+) -> Any:
+    """
+    Start importing data from a data source. Poll the returned job for the result.
+    """
+    job = await create_import_job(source.owner_id, source.id)
+    
+    # Import runs after the response is sent; rows are streamed into Redis
+    background_tasks.add_task(run_import_job, job, source)
+    
+    return {
+        "job_id": job["job_id"],
+        "status": job["status"],
+    }
+
+
+@router.get("/import-jobs/{job_id}", response_model=Dict)
+async def get_import_job_status(
+    *,
+    job_id: str,
+    current_user: User = Depends(get_current_active_user),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
 ) -> Any:
     """
-    Import data from a data source.
+    Get the status of an import job and a page of the imported rows.
     """
-    # Import data from source
-    data = import_data(source)
+    job = await get_import_job(job_id)
+    if not job or job["owner_id"] != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Import job not found",
+        )
     
     return {
-        "data": data,
-        "rows": len(data),
-        "columns": len(data[0]) if data else 0,
+        "job_id": job["job_id"],
+        "data_source_id": job["data_source_id"],
+        "status": job["status"],
+        "error": job["error"],
+        "rows": job["rows"],
+        "columns": job["columns"],
+        "data": await get_import_job_rows(job_id, skip, limit),
     } 
\ No newline at end of file
@@ -1,7 +1,8 @@
 from typing import Any, List, Dict, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, status, Body, Query
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.base import get_db
 from app.models.user import User
@@ -14,6 +15,7 @@ from app.models.schemas.financial_model import (
     ModelVersion as ModelVersionSchema,
     ModelVersionCreate,
 )
+from app.models.schemas.page import Page
 from app.auth.deps import get_current_active_user
 from app.api.deps import get_financial_model
 from app.services.model_runner import run_model, generate_model_code
@@ -21,33 +23,40 @@ from app.services.model_runner import run_model, generate_model_code
 router = APIRouter()
 
 
-@router.get("", response_model=List[FinancialModelSchema])
-def list_financial_models(
-    db: Session = Depends(get_db),
+@router.get("", response_model=Page[FinancialModelSchema])
+async def list_financial_models(
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
-    skip: int = 0,
-    limit: int = 100,
+    after_id: Optional[int] = None,
+    limit: int = Query(100, ge=1, le=1000),
     model_type: Optional[str] = None,
 ) -> Any:
     """
-    Retrieve financial models.
+    Retrieve financial models, paginated by ID. Pass the returned next_cursor as after_id for the next page.
     """
-    query = db.query(FinancialModel)
-    query = query.filter(
+    # Select plain rows; the response model validates the mappings directly
+    query = select(FinancialModel.__table__)
+    query = query.where(
         (FinancialModel.owner_id == current_user.id) | (FinancialModel.is_public == True)
     )
     
     if model_type:
-        query = query.filter(FinancialModel.model_type == model_type)
+        query = query.where(FinancialModel.model_type == model_type)
     
-    models = query.offset(skip).limit(limit).all()
-    return models
+    if after_id is not None:
+        query = query.where(FinancialModel.id > after_id)
+    
+    models = (await db.execute(query.order_by(FinancialModel.id).limit(limit))).mappings().all()
+    return {
+        "items": models,
+        "next_cursor": models[-1]["id"] if len(models) == limit else None,
+    }
 
 
 @router.post("", response_model=FinancialModelSchema)
-def create_financial_model(
+async def create_financial_model(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     model_in: FinancialModelCreate,
     current_user: User = Depends(get_current_active_user),
 ) -> Any:
@@ -65,8 +74,8 @@ def create_financial_model(
     )
     
     db.add(model)
-    db.commit()
-    db.refresh(model)
+    await db.commit()
+    await db.refresh(model)
     
     # Create initial version
     version = ModelVersion(
@@ -78,13 +87,14 @@ def create_financial_model(
     )
     
     db.add(version)
-    db.commit()
+    await db.commit()
+    await db.refresh(model)
     
     return model
 
 
 @router.get("/{model_id}", response_model=FinancialModelSchema)
-def get_financial_model_by_id(
+async def get_financial_model_by_id(
     model: FinancialModel = Depends(get_financial_model),
 ) -> Any:
     """
@@ -94,9 +104,9 @@ def get_financial_model_by_id(
 
 
 @router.put("/{model_id}", response_model=FinancialModelSchema)
-def update_financial_model(
+async def update_financial_model(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     model: FinancialModel = Depends(get_financial_model),
     model_in: FinancialModelUpdate,
 ) -> Any:
@@ -105,52 +115,55 @@ def update_financial_model(
     """
     # Create a new version if code or parameters have changed
     create_new_version = False
-    version_number = 1
-    
-    if len(model.versions) > 0:
-        version_number = max([v.version_number for v in model.versions]) + 1
     
     if (model_in.code is not None and model_in.code != model.code) or (
         model_in.parameters is not None and model_in.parameters != model.parameters
     ):
         create_new_version = True
-    
-    # Update model attributes
-    data_to_update = model_in.dict(exclude_unset=True)
-    for field, value in data_to_update.items():
-        setattr(model, field, value)
-    
-    db.add(model)
-    db.commit()
-    db.refresh(model)
+        version_number = (await db.execute(
+            select(func.coalesce(func.max(ModelVersion.version_number), 0) + 1)
+            .where(ModelVersion.model_id == model.id)
+        )).scalar_one()
+    
+    # Update model attributes with a single UPDATE ... RETURNING. Session sync must stay
+    # on: without it populate_existing is ignored and the version would get the old code.
+    data_to_update = model_in.model_dump(exclude_unset=True)
+    if data_to_update:
+        model = (await db.execute(
+            update(FinancialModel)
+            .where(FinancialModel.id == model.id)
+            .values(**data_to_update)
+            .returning(FinancialModel)
+            .execution_options(populate_existing=True)
+        )).scalar_one()
     
     # Create new version if needed
     if create_new_version:
         version = ModelVersion(
-            model_id=model.id,
             version_number=version_number,
             code=model.code,
             parameters=model.parameters,
             description=f"Version {version_number} of {model.name}",
         )
         
-        db.add(version)
-        db.commit()
+        model.versions.append(version)
+    
+    await db.commit()
     
     return model
 
 
 @router.delete("/{model_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_financial_model(
+async def delete_financial_model(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     model: FinancialModel = Depends(get_financial_model),
 ) -> Any:
     """
     Delete a financial model.
     """
-    db.delete(model)
-    db.commit()
+    await db.delete(model)
+    await db.commit()
     return None
 
 
@@ -172,12 +185,14 @@ def run_financial_model(
     # Run the model
     result = run_model(model.code, model_params)
     
-    # Return model with results
-    return {**model.__dict__, "result": result}
+    # Return model with results (dumped through the schema so no ORM internals leak into validation)
+    payload = FinancialModelSchema.model_validate(model).model_dump()
+    payload["result"] = result
+    return payload
 
 
 @router.get("/{model_id}/versions", response_model=List[ModelVersionSchema])
-def list_model_versions(
+async def list_model_versions(
     *,
     model: FinancialModel = Depends(get_financial_model),
 ) -> Any:
@@ -188,19 +203,19 @@ def list_model_versions(
 
 
 @router.get("/{model_id}/versions/{version_number}", response_model=ModelVersionSchema)
-def get_model_version(
+async def get_model_version(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     model: FinancialModel = Depends(get_financial_model),
     version_number: int,
 ) -> Any:
     """
     Get a specific version of a financial model.
     """
-    version = db.query(ModelVersion).filter(
+    version = await db.scalar(select(ModelVersion).where(
         ModelVersion.model_id == model.id,
         ModelVersion.version_number == version_number,
-    ).first()
+    ))
     
     if not version:
         raise HTTPException(
@@ -1,19 +1,21 @@
 from typing import Any, List
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.base import get_db
 from app.models.user import User
 from app.models.schemas.user import User as UserSchema, UserCreate, UserUpdate
 from app.auth.deps import get_current_active_user, get_current_active_superuser
-from app.auth.jwt import get_password_hash
+from app.auth.jwt import get_password_hash_async
+from app.cache.token_cache import invalidate_user
 
 router = APIRouter()
 
 
 @router.get("/me", response_model=UserSchema)
-def read_user_me(
+async def read_user_me(
     current_user: User = Depends(get_current_active_user),
 ) -> Any:
     """
@@ -23,9 +25,9 @@ def read_user_me(
 
 
 @router.put("/me", response_model=UserSchema)
-def update_user_me(
+async def update_user_me(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     user_in: UserUpdate,
     current_user: User = Depends(get_current_active_user),
 ) -> Any:
@@ -33,7 +35,7 @@ def update_user_me(
     Update own user.
     """
     if user_in.email and user_in.email != current_user.email:
-        user = db.query(User).filter(User.email == user_in.email).first()
+        user = await db.scalar(select(User).where(User.email == user_in.email))
         if user:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -41,7 +43,7 @@ def update_user_me(
             )
     
     if user_in.username and user_in.username != current_user.username:
-        user = db.query(User).filter(User.username == user_in.username).first()
+        user = await db.scalar(select(User).where(User.username == user_in.username))
         if user:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -50,7 +52,7 @@ def update_user_me(
     
     data_to_update = user_in.dict(exclude_unset=True)
     if user_in.password:
-        hashed_password = get_password_hash(user_in.password)
+        hashed_password = await get_password_hash_async(user_in.password)
         data_to_update["hashed_password"] = hashed_password
         data_to_update.pop("password", None)
     
@@ -58,15 +60,18 @@ def update_user_me(
         setattr(current_user, field, value)
     
     db.add(current_user)
-    db.commit()
-    db.refresh(current_user)
+    await db.commit()
+    await db.refresh(current_user)
+    
+    # Cached tokens hold a snapshot of the user row
+    await invalidate_user(current_user.id)
     
     return current_user
 
 
 @router.get("", response_model=List[UserSchema])
-def read_users(
-    db: Session = Depends(get_db),
+async def read_users(
+    db: AsyncSession = Depends(get_db),
     skip: int = 0,
     limit: int = 100,
     current_user: User = Depends(get_current_active_superuser),
@@ -74,20 +79,20 @@ def read_users(
     """
     Retrieve users. Only for superusers.
     """
-    users = db.query(User).offset(skip).limit(limit).all()
+    users = (await db.scalars(select(User).offset(skip).limit(limit))).all()
     return users
 
 
 @router.get("/{user_id}", response_model=UserSchema)
-def read_user_by_id(
+async def read_user_by_id(
     user_id: int,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ) -> Any:
     """
     Get a specific user by id.
     """
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.scalar(select(User).where(User.id == user_id))
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
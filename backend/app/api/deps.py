@@ -1,24 +1,23 @@
 from typing import Generator
 
 from fastapi import Depends, HTTPException, status
-from sqlalchemy.orm import Session
 
-from app.db.base import get_db
 from app.models.user import User
 from app.models.financial_model import FinancialModel
 from app.models.data_source import DataSource
 from app.auth.deps import get_current_active_user
+from app.api.loaders import FinancialModelLoader, DataSourceLoader, get_model_loader, get_source_loader
 
 
-def get_financial_model(
+async def get_financial_model(
     model_id: int,
-    db: Session = Depends(get_db),
+    loader: FinancialModelLoader = Depends(get_model_loader),
     current_user: User = Depends(get_current_active_user),
 ) -> FinancialModel:
     """
     Get a financial model by ID, check if the current user has access to it
     """
-    model = db.query(FinancialModel).filter(FinancialModel.id == model_id).first()
+    model = await loader.load(model_id)
     
     if not model:
         raise HTTPException(
@@ -36,15 +35,15 @@ def get_financial_model(
     return model
 
 
-def get_data_source(
+async def get_data_source(
     source_id: int,
-    db: Session = Depends(get_db),
+    loader: DataSourceLoader = Depends(get_source_loader),
     current_user: User = Depends(get_current_active_user),
 ) -> DataSource:
     """
     Get a data source by ID, check if the current user has access to it
     """
-    source = db.query(DataSource).filter(DataSource.id == source_id).first()
+    source = await loader.load(source_id)
     
     if not source:
         raise HTTPException(
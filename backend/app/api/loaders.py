@@ -0,0 +1,49 @@
+from typing import List, Optional
+
+from aiodataloader import DataLoader
+from fastapi import Depends
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.base import get_db
+from app.models.financial_model import FinancialModel
+from app.models.data_source import DataSource
+
+
+class FinancialModelLoader(DataLoader):
+    """
+    Batch financial model lookups made during a request into a single query
+    """
+
+    def __init__(self, db: AsyncSession):
+        super().__init__()
+        self.db = db
+
+    async def batch_load_fn(self, ids: List[int]) -> List[Optional[FinancialModel]]:
+        rows = await self.db.scalars(select(FinancialModel).where(FinancialModel.id.in_(ids)))
+        by_id = {row.id: row for row in rows}
+        return [by_id.get(i) for i in ids]
+
+
+class DataSourceLoader(DataLoader):
+    """
+    Batch data source lookups made during a request into a single query
+    """
+
+    def __init__(self, db: AsyncSession):
+        super().__init__()
+        self.db = db
+
+    async def batch_load_fn(self, ids: List[int]) -> List[Optional[DataSource]]:
+        rows = await self.db.scalars(select(DataSource).where(DataSource.id.in_(ids)))
+        by_id = {row.id: row for row in rows}
+        return [by_id.get(i) for i in ids]
+
+
+# FastAPI caches dependencies per request, so each request gets one loader bound to its session
+async def get_model_loader(db: AsyncSession = Depends(get_db)) -> FinancialModelLoader:
+    return FinancialModelLoader(db)
+
+
+async def get_source_loader(db: AsyncSession = Depends(get_db)) -> DataSourceLoader:
+    return DataSourceLoader(db)
@@ -1,43 +1,74 @@
+from datetime import datetime
 from typing import Generator, Optional
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import DateTime, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
 
 from app.db.base import get_db
 from app.models.user import User
 from app.auth.jwt import validate_token
+from app.cache.token_cache import get_cached_user, cache_user
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
+# User columns kept in the token cache. hashed_password is deliberately left out:
+# it stays unloaded on a user rebuilt from the cache, so only read it from a user
+# queried from the database (as login does).
+_CACHED_COLUMNS = (
+    "id", "email", "username", "full_name", "is_active", "is_superuser", "created_at", "updated_at",
+)
 
-def get_current_user(
-    db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)
+# Cached columns stored as ISO strings in the token cache
+_DATETIME_COLUMNS = [key for key in _CACHED_COLUMNS if isinstance(User.__table__.columns[key].type, DateTime)]
+
+
+async def get_current_user(
+    db: AsyncSession = Depends(get_db), token: str = Depends(oauth2_scheme)
 ) -> User:
-    token_data = validate_token(token)
-    if not token_data:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    user = db.query(User).filter(User.id == token_data.sub).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
+    user_data = await get_cached_user(token)
+    if user_data is not None:
+        for key in _DATETIME_COLUMNS:
+            if user_data.get(key):
+                user_data[key] = datetime.fromisoformat(user_data[key])
+        
+        # Rebuild the user from the cache and attach it to the session as if it was loaded
+        user = User(**user_data)
+        make_transient_to_detached(user)
+        db.add(user)
+    else:
+        token_data = validate_token(token)
+        if not token_data:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Could not validate credentials",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        user = await db.scalar(select(User).where(User.id == token_data.sub))
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        if user.is_active:
+            await cache_user(
+                token,
+                token_data.exp,
+                {key: getattr(user, key) for key in _CACHED_COLUMNS},
+            )
     if not user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return user
 
 
-def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
+async def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
 
 
-def get_current_active_superuser(current_user: User = Depends(get_current_user)) -> User:
+async def get_current_active_superuser(current_user: User = Depends(get_current_user)) -> User:
     if not current_user.is_superuser:
         raise HTTPException(
             status_code=403, detail="The user doesn't have enough privileges"
         )
-    return current_user 
\ No newline at end of file
+    return current_user
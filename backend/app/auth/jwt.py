@@ -1,6 +1,7 @@
 from datetime import datetime, timedelta
 from typing import Optional, Union
 
+import anyio
 from jose import jwt
 from passlib.context import CryptContext
 from pydantic import ValidationError
@@ -38,6 +39,15 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+# bcrypt is deliberately slow; run it in a worker thread from async code
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await anyio.to_thread.run_sync(pwd_context.verify, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    return await anyio.to_thread.run_sync(pwd_context.hash, password)
+
+
 def validate_token(token: str) -> Optional[TokenPayload]:
     try:
         payload = jwt.decode(
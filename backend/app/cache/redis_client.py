@@ -0,0 +1,22 @@
+from typing import Optional
+
+import redis.asyncio as redis
+
+from app.core.config import settings
+
+# Shared async Redis client; the connection pool is created lazily on first use
+_redis: Optional[redis.Redis] = None
+
+
+def get_redis() -> redis.Redis:
+    global _redis
+    if _redis is None:
+        _redis = redis.from_url(settings.REDIS_URL)
+    return _redis
+
+
+async def close_redis() -> None:
+    global _redis
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
@@ -0,0 +1,59 @@
+import hashlib
+import time
+from typing import Any, Dict, Optional
+
+import orjson
+
+from app.cache.redis_client import get_redis
+from app.core.config import settings
+
+# Validated access tokens are cached in Redis so every worker sees the same entries
+# and invalidation reaches all of them:
+#   auth:token:{sha256(token)}  orjson-encoded user columns (no password hash), expiring with the token
+#   auth:user:{id}:tokens       set of the user's cached token keys, for invalidation
+
+
+def _token_key(token: str) -> str:
+    return "auth:token:" + hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def _user_tokens_key(user_id: int) -> str:
+    return f"auth:user:{user_id}:tokens"
+
+
+async def get_cached_user(token: str) -> Optional[Dict[str, Any]]:
+    """
+    Get the cached user data for a token, or None if it is missing or expired
+    """
+    raw = await get_redis().get(_token_key(token))
+    return orjson.loads(raw) if raw else None
+
+
+async def cache_user(token: str, exp: Optional[int], user_data: Dict[str, Any]) -> None:
+    """
+    Cache user data for a validated token, never beyond the token's own expiry
+    """
+    ttl = settings.TOKEN_CACHE_TTL
+    if exp is not None:
+        ttl = min(ttl, int(exp - time.time()))
+
+    if ttl <= 0:
+        return
+
+    key = _token_key(token)
+    user_tokens_key = _user_tokens_key(user_data["id"])
+    async with get_redis().pipeline(transaction=True) as pipe:
+        pipe.set(key, orjson.dumps(user_data), ex=ttl)
+        pipe.sadd(user_tokens_key, key)
+        pipe.expire(user_tokens_key, settings.TOKEN_CACHE_TTL)
+        await pipe.execute()
+
+
+async def invalidate_user(user_id: int) -> None:
+    """
+    Drop every cached token belonging to a user (e.g. after the user is updated)
+    """
+    redis = get_redis()
+    user_tokens_key = _user_tokens_key(user_id)
+    token_keys = await redis.smembers(user_tokens_key)
+    await redis.delete(user_tokens_key, *token_keys)
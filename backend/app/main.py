@@ -1,24 +1,103 @@
 import logging
+import queue
+from contextlib import asynccontextmanager
+from logging.handlers import QueueHandler, QueueListener
+
+import anyio
+import httpx
 from fastapi import FastAPI, Depends, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.pool import NullPool
 
 from app.api.api_v1.api import api_router
 from app.core.config import settings
-from app.db.base import Base, engine, get_db
+from app.db.base import Base, engine
 from app.models.user import User
-from app.auth.jwt import get_password_hash
+from app.auth.jwt import get_password_hash_async
+from app.services import llm_service
+from app.cache.redis_client import close_redis
 
-logging.basicConfig(level=logging.INFO)
+# Handlers only enqueue records; a listener thread does the stream I/O off the event loop
+_log_queue = queue.SimpleQueue()
+_log_handler = logging.StreamHandler()
+_log_handler.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+log_listener = QueueListener(_log_queue, _log_handler, respect_handler_level=True)
+# The queue side only renders the message (and traceback); the listener adds the prefix
+_queue_handler = QueueHandler(_log_queue)
+_queue_handler.setFormatter(logging.Formatter("%(message)s"))
+logging.basicConfig(level=logging.INFO, handlers=[_queue_handler])
 logger = logging.getLogger(__name__)
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+
+async def create_tables(bind: AsyncEngine):
+    # Only in development; other environments manage the schema with Alembic (alembic upgrade head)
+    if settings.ENV == "development":
+        async with bind.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+
+async def create_superuser(bind: AsyncEngine):
+    try:
+        async with AsyncSession(bind) as db:
+            # Check if superuser exists
+            superuser = await db.scalar(select(User).where(User.is_superuser == True))
+            if not superuser:
+                logger.info("Creating default superuser")
+                superuser = User(
+                    email=settings.SUPERUSER_EMAIL,
+                    username=settings.SUPERUSER_USERNAME,
+                    full_name="Admin User",
+                    hashed_password=await get_password_hash_async(settings.SUPERUSER_PASSWORD),
+                    is_active=True,
+                    is_superuser=True,
+                )
+                db.add(superuser)
+                await db.commit()
+                logger.info("Default superuser created")
+    except Exception as e:
+        logger.error(f"Error creating default superuser: {e}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    log_listener.start()
+    
+    # Raise the worker thread limit so bursts of password hashing don't queue behind other sync work
+    anyio.to_thread.current_default_thread_limiter().total_tokens = 64
+
+    # One-shot bootstrap work uses its own unpooled engine so it never holds a request pool slot
+    bootstrap_engine = create_async_engine(engine.url, poolclass=NullPool)
+    try:
+        await create_tables(bootstrap_engine)
+        await create_superuser(bootstrap_engine)
+    finally:
+        await bootstrap_engine.dispose()
+
+    # Shared HTTP client for outbound calls (OpenAI), pooled across requests
+    app.state.http = httpx.AsyncClient(
+        http2=True,
+        timeout=60,
+        limits=httpx.Limits(max_connections=200, max_keepalive_connections=50),
+    )
+    llm_service.init_client(app.state.http)
+
+    yield
+
+    await app.state.http.aclose()
+    await close_redis()
+    await engine.dispose()
+    log_listener.stop()
+
 
 app = FastAPI(
     title=settings.APP_NAME,
     description="LLM-powered financial forecasting API",
     version="0.1.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
 # Set up CORS middleware
@@ -28,6 +107,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Conversation-ID"],
 )
 
 # Include API router
@@ -40,30 +120,6 @@ def health_check():
     return {"status": "ok", "version": "0.1.0"}
 
 
-# Startup event to create superuser if needed
-@app.on_event("startup")
-def create_superuser():
-    try:
-        db = next(get_db())
-        # Check if superuser exists
-        superuser = db.query(User).filter(User.is_superuser == True).first()
-        if not superuser:
-            logger.info("Creating default superuser")
-            superuser = User(
-                email=settings.SUPERUSER_EMAIL,
-                username=settings.SUPERUSER_USERNAME,
-                full_name="Admin User",
-                hashed_password=get_password_hash(settings.SUPERUSER_PASSWORD),
-                is_active=True,
-                is_superuser=True,
-            )
-            db.add(superuser)
-            db.commit()
-            logger.info("Default superuser created")
-    except Exception as e:
-        logger.error(f"Error creating default superuser: {e}")
-
-
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
@@ -71,4 +127,6 @@ if __name__ == "__main__":
         host="0.0.0.0",
         port=settings.PORT,
         reload=settings.ENV == "development",
-    ) 
\ No newline at end of file
+        loop="uvloop",
+        http="httptools",
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, JSON, Boolean
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, JSON, Boolean, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 
@@ -6,6 +6,9 @@ from app.db.base import Base
 
 class DataSource(Base):
     __tablename__ = "data_sources"
+    __table_args__ = (
+        Index("ix_data_sources_owner_source", "owner_id", "source_type"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True)
@@ -20,7 +23,7 @@ class DataSource(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     # Relationships
-    owner = relationship("User")
+    owner = relationship("User", lazy="selectin")
     
     def __repr__(self):
         return f"DataSource(id={self.id}, name={self.name}, type={self.source_type})" 
\ No newline at end of file
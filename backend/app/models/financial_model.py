@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, Integer, String, Text, DateTime, ForeignKey, JSON
+from sqlalchemy import Boolean, Column, Integer, String, Text, DateTime, ForeignKey, JSON, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 
@@ -6,6 +6,9 @@ from app.db.base import Base
 
 class FinancialModel(Base):
     __tablename__ = "financial_models"
+    __table_args__ = (
+        Index("ix_financial_models_owner_public_type", "owner_id", "is_public", "model_type"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True)
@@ -19,8 +22,8 @@ class FinancialModel(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     # Relationships
-    owner = relationship("User", back_populates="models")
-    versions = relationship("ModelVersion", back_populates="model")
+    owner = relationship("User", back_populates="models", lazy="selectin")
+    versions = relationship("ModelVersion", back_populates="model", lazy="selectin")
     
     def __repr__(self):
         return f"FinancialModel(id={self.id}, name={self.name}, type={self.model_type})"
@@ -28,6 +31,9 @@ class FinancialModel(Base):
 
 class ModelVersion(Base):
     __tablename__ = "model_versions"
+    __table_args__ = (
+        Index("ix_model_versions_model_version", "model_id", "version_number", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     model_id = Column(Integer, ForeignKey("financial_models.id"))
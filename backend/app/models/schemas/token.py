@@ -10,6 +10,7 @@ class Token(BaseModel):
 
 class TokenPayload(BaseModel):
     sub: Optional[int] = None
+    exp: Optional[int] = None
 
 
 class RefreshToken(BaseModel):
@@ -1,18 +1,58 @@
+import importlib.util
 import pandas as pd
 import io
-import json
-from typing import Dict, List, Tuple, Any, Optional
+import orjson
+from typing import BinaryIO, Dict, Iterator, List, Tuple, Any, Optional
 
+from app.core.config import settings
 from app.models.data_source import DataSource
 
+# Rows per chunk when streaming CSV and database imports
+IMPORT_CHUNK_ROWS = 50_000
 
-def get_data_preview(file_name: str, file_contents: bytes, source_type: str) -> Tuple[List[Dict], Dict]:
+# Schema type for each numpy dtype kind; anything else is reported as a string
+_KIND_MAP = {
+    'i': 'integer',
+    'u': 'integer',
+    'f': 'number',
+    'M': 'datetime',
+    'b': 'boolean',
+}
+
+# Excel reader: calamine when installed, otherwise let pandas choose by file type
+# (openpyxl for .xlsx, which pandas already opens in read-only, data-only mode, so
+# no engine_kwargs are passed)
+EXCEL_ENGINE = 'calamine' if importlib.util.find_spec('python_calamine') else None
+
+# orjson options for exported records (numpy scalars, non-string column names)
+JSON_EXPORT_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def _df_to_records(df: pd.DataFrame) -> List[Dict]:
+    """
+    Convert a DataFrame to a list of row dictionaries.
+    
+    Builds rows from per-column lists instead of going through pandas'
+    row-by-row to_dict(orient='records') path.
+    """
+    columns = list(df.columns)
+    
+    # A single numeric dtype converts in one shot without changing any value types
+    if len(columns) > 0 and df.dtypes.nunique() == 1 and pd.api.types.is_numeric_dtype(df.dtypes.iloc[0]):
+        rows = df.to_numpy().tolist()
+    else:
+        rows = zip(*[df.iloc[:, i].tolist() for i in range(len(columns))])
+    
+    return [dict(zip(columns, row)) for row in rows]
+
+
+def get_data_preview(file_name: str, file_obj: BinaryIO, source_type: str) -> Tuple[List[Dict], Dict]:
     """
     Get a preview of the data from a file, along with the detected schema.
     
     Args:
         file_name: The name of the file
-        file_contents: The contents of the file as bytes
+        file_obj: A binary file-like object positioned at the start of the file
         source_type: The type of data source (CSV, Excel, etc.)
         
     Returns:
@@ -20,37 +60,25 @@ def get_data_preview(file_name: str, file_contents: bytes, source_type: str) ->
     """
     df = None
     
-    # Convert bytes to file-like object
-    file_obj = io.BytesIO(file_contents)
-    
     # Process file based on type
     if source_type.lower() == 'csv':
         df = pd.read_csv(file_obj, nrows=100)
     elif source_type.lower() == 'excel':
-        df = pd.read_excel(file_obj, nrows=100)
+        df = pd.read_excel(file_obj, nrows=100, engine=EXCEL_ENGINE)
     elif source_type.lower() == 'json':
-        data = json.loads(file_contents.decode('utf-8'))
+        data = orjson.loads(file_obj.read())
+        # Only the preview rows need normalizing
+        if isinstance(data, list):
+            data = data[:100]
         df = pd.json_normalize(data)
     else:
         raise ValueError(f"Unsupported file type: {source_type}")
     
     # Generate schema from DataFrame
-    schema = {}
-    for column in df.columns:
-        dtype = str(df[column].dtype)
-        if 'int' in dtype:
-            schema[column] = 'integer'
-        elif 'float' in dtype:
-            schema[column] = 'number'
-        elif 'datetime' in dtype:
-            schema[column] = 'datetime'
-        elif 'bool' in dtype:
-            schema[column] = 'boolean'
-        else:
-            schema[column] = 'string'
+    schema = {column: _KIND_MAP.get(dtype.kind, 'string') for column, dtype in df.dtypes.items()}
     
     # Convert preview to list of dicts
-    preview_data = df.head(10).to_dict(orient='records')
+    preview_data = _df_to_records(df.head(10))
     
     return preview_data, schema
 
@@ -65,8 +93,29 @@ def import_data(data_source: DataSource) -> List[Dict]:
     Returns:
         The imported data as a list of dictionaries
     """
+    return list(iter_import_data(data_source))
+
+
+def iter_import_data(data_source: DataSource) -> Iterator[Dict]:
+    """
+    Import data from a data source, yielding one record at a time.
+    
+    CSV and database sources are read in chunks of IMPORT_CHUNK_ROWS rows, so only
+    one chunk is held as a DataFrame at a time. An optional 'columns' list in the
+    connection info restricts which columns are read from CSV and Excel files, and
+    an optional 'schema' mapping of column name to dtype is passed to the CSV
+    reader so column types are not inferred chunk by chunk.
+    
+    Args:
+        data_source: The DataSource object containing connection info
+        
+    Yields:
+        The imported records as dictionaries
+    """
     source_type = data_source.source_type.lower()
     connection_info = data_source.connection_info
+    columns = connection_info.get('columns')
+    schema = connection_info.get('schema')
     
     if source_type == 'csv':
         # Import from CSV file
@@ -74,8 +123,8 @@ def import_data(data_source: DataSource) -> List[Dict]:
         if not file_path:
             raise ValueError("File path is required for CSV data source")
         
-        df = pd.read_csv(file_path)
-        return df.to_dict(orient='records')
+        for chunk in pd.read_csv(file_path, chunksize=IMPORT_CHUNK_ROWS, usecols=columns, dtype=schema):
+            yield from _df_to_records(chunk)
     
     elif source_type == 'excel':
         # Import from Excel file
@@ -85,12 +134,11 @@ def import_data(data_source: DataSource) -> List[Dict]:
         if not file_path:
             raise ValueError("File path is required for Excel data source")
         
-        if sheet_name:
-            df = pd.read_excel(file_path, sheet_name=sheet_name)
-        else:
-            df = pd.read_excel(file_path)
+        # Excel has no chunked mode; the sheet is read in one go
+        with pd.ExcelFile(file_path, engine=EXCEL_ENGINE) as workbook:
+            df = workbook.parse(sheet_name=sheet_name or 0, usecols=columns)
             
-        return df.to_dict(orient='records')
+        yield from _df_to_records(df)
     
     elif source_type == 'database':
         # Import from database (using SQLAlchemy)
@@ -100,26 +148,27 @@ def import_data(data_source: DataSource) -> List[Dict]:
         if not connection_string or not query:
             raise ValueError("Connection string and query are required for database data source")
         
-        df = pd.read_sql(query, connection_string)
-        return df.to_dict(orient='records')
+        for chunk in pd.read_sql(query, connection_string, chunksize=IMPORT_CHUNK_ROWS):
+            yield from _df_to_records(chunk)
     
     elif source_type == 'api':
-        # Import from API (using requests)
-        import requests
+        # Import from API (using httpx)
+        import httpx
         
         url = connection_info.get('url')
         method = connection_info.get('method', 'GET')
         headers = connection_info.get('headers', {})
         params = connection_info.get('params', {})
         body = connection_info.get('body')
+        timeout = connection_info.get('timeout', settings.API_IMPORT_TIMEOUT)
         
         if not url:
             raise ValueError("URL is required for API data source")
         
         if method.upper() == 'GET':
-            response = requests.get(url, headers=headers, params=params)
+            response = httpx.get(url, headers=headers, params=params, timeout=timeout, follow_redirects=True)
         elif method.upper() == 'POST':
-            response = requests.post(url, headers=headers, params=params, json=body)
+            response = httpx.post(url, headers=headers, params=params, json=body, timeout=timeout, follow_redirects=True)
         else:
             raise ValueError(f"Unsupported HTTP method: {method}")
         
@@ -128,20 +177,22 @@ def import_data(data_source: DataSource) -> List[Dict]:
         # Parse response as JSON
         data = response.json()
         
-        # If data is a list, convert to DataFrame
+        # If data is a dict, try to extract the data array (its first non-empty list)
+        if isinstance(data, dict):
+            data = next((value for value in data.values() if isinstance(value, list) and value), data)
+        
+        # A list of records is already in the target format
+        if isinstance(data, list) and all(isinstance(item, dict) for item in data):
+            yield from data
+            return
+        
         if isinstance(data, list):
             df = pd.DataFrame(data)
         else:
-            # If data is a dict, try to extract the data array
-            for key, value in data.items():
-                if isinstance(value, list) and len(value) > 0:
-                    df = pd.DataFrame(value)
-                    break
-            else:
-                # If no list found, use the entire response
-                df = pd.json_normalize(data)
+            # If no list found, use the entire response
+            df = pd.json_normalize(data)
         
-        return df.to_dict(orient='records')
+        yield from _df_to_records(df)
     
     else:
         raise ValueError(f"Unsupported data source type: {source_type}")
@@ -159,18 +210,16 @@ def export_data(data: List[Dict], format: str, file_path: Optional[str] = None)
     Returns:
         The exported data as bytes if file_path is None, otherwise None
     """
-    df = pd.DataFrame(data)
-    
     if format.lower() == 'csv':
+        df = pd.DataFrame(data)
         if file_path:
             df.to_csv(file_path, index=False)
             return None
         else:
-            output = io.BytesIO()
-            df.to_csv(output, index=False)
-            return output.getvalue()
+            return df.to_csv(None, index=False).encode()
     
     elif format.lower() == 'excel':
+        df = pd.DataFrame(data)
         if file_path:
             df.to_excel(file_path, index=False)
             return None
@@ -181,11 +230,11 @@ def export_data(data: List[Dict], format: str, file_path: Optional[str] = None)
     
     elif format.lower() == 'json':
         if file_path:
-            with open(file_path, 'w') as f:
-                json.dump(data, f)
+            with open(file_path, 'wb') as f:
+                f.write(orjson.dumps(data, option=JSON_EXPORT_OPTIONS))
             return None
         else:
-            return json.dumps(data).encode('utf-8')
+            return orjson.dumps(data, option=JSON_EXPORT_OPTIONS)
     
     else:
         raise ValueError(f"Unsupported export format: {format}") 
\ No newline at end of file
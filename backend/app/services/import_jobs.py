@@ -0,0 +1,107 @@
+import uuid
+from datetime import datetime
+from itertools import islice
+from typing import Dict, Any, Iterator, List, Optional
+
+import anyio
+import orjson
+
+from app.cache.redis_client import get_redis
+from app.core.config import settings
+from app.models.data_source import DataSource
+from app.services.data_importer import JSON_EXPORT_OPTIONS, iter_import_data
+
+# Import jobs live in Redis so any worker can report on them:
+#   import_job:{id}       orjson-encoded job status
+#   import_job:{id}:rows  list of orjson-encoded imported rows
+# Both keys expire IMPORT_JOB_TTL seconds after the job was last updated.
+
+# Rows read from the source (in a worker thread) and pushed to Redis per round trip
+IMPORT_JOB_BATCH_ROWS = 1000
+
+
+def _job_key(job_id: str) -> str:
+    return f"import_job:{job_id}"
+
+
+def _rows_key(job_id: str) -> str:
+    return f"import_job:{job_id}:rows"
+
+
+async def _save_job(job: Dict[str, Any]) -> None:
+    await get_redis().set(_job_key(job["job_id"]), orjson.dumps(job), ex=settings.IMPORT_JOB_TTL)
+
+
+async def create_import_job(owner_id: int, data_source_id: int) -> Dict[str, Any]:
+    """
+    Register a pending import job.
+    
+    Args:
+        owner_id: The ID of the user who started the import
+        data_source_id: The ID of the data source being imported
+    
+    Returns:
+        The job dictionary
+    """
+    job = {
+        "job_id": str(uuid.uuid4()),
+        "owner_id": owner_id,
+        "data_source_id": data_source_id,
+        "status": "pending",
+        "created_at": datetime.now().isoformat(),
+        "rows": 0,
+        "columns": 0,
+        "error": None,
+    }
+    await _save_job(job)
+    return job
+
+
+async def get_import_job(job_id: str) -> Optional[Dict[str, Any]]:
+    raw = await get_redis().get(_job_key(job_id))
+    return orjson.loads(raw) if raw else None
+
+
+async def get_import_job_rows(job_id: str, skip: int, limit: int) -> List[Dict[str, Any]]:
+    """
+    Get a page of a job's imported rows.
+    """
+    raw_rows = await get_redis().lrange(_rows_key(job_id), skip, skip + limit - 1)
+    return [orjson.loads(raw) for raw in raw_rows]
+
+
+async def run_import_job(job: Dict[str, Any], data_source: DataSource) -> None:
+    """
+    Import data for a job, streaming the rows into Redis in batches, and record
+    the outcome on the job. Only one batch of rows is held in memory at a time.
+    
+    Args:
+        job: The job dictionary returned by create_import_job
+        data_source: The DataSource object containing connection info
+    """
+    redis = get_redis()
+    rows_key = _rows_key(job["job_id"])
+    
+    job["status"] = "running"
+    await _save_job(job)
+    
+    try:
+        # Reading the source blocks, so each batch is pulled in a worker thread
+        records: Iterator[Dict] = iter_import_data(data_source)
+        while batch := await anyio.to_thread.run_sync(lambda: list(islice(records, IMPORT_JOB_BATCH_ROWS))):
+            async with redis.pipeline(transaction=False) as pipe:
+                pipe.rpush(rows_key, *[orjson.dumps(row, default=str, option=JSON_EXPORT_OPTIONS) for row in batch])
+                pipe.expire(rows_key, settings.IMPORT_JOB_TTL)
+                await pipe.execute()
+    
+            if not job["rows"]:
+                job["columns"] = len(batch[0])
+            job["rows"] += len(batch)
+    except Exception as e:
+        job["status"] = "failed"
+        job["error"] = str(e)
+        await _save_job(job)
+        return
+    
+    job["status"] = "completed"
+    await _save_job(job)
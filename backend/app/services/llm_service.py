@@ -1,18 +1,129 @@
 import os
-import json
+import re
+import asyncio
+import hashlib
+import logging
+import weakref
+import httpx
 import openai
-from typing import Dict, Any, Tuple, List, Optional
+import orjson
+from cachetools import TTLCache
+from typing import AsyncIterator, Dict, Any, Mapping, Tuple, List, Optional
 import uuid
 from datetime import datetime
+from functools import lru_cache
+from types import MappingProxyType
 
+from app.cache.redis_client import get_redis
 from app.core.config import settings
 
-# Set OpenAI API key from settings
-openai.api_key = settings.OPENAI_API_KEY
+logger = logging.getLogger(__name__)
 
-# Store conversations in memory for demo
-# In production, this would be stored in a database
-conversations = {}
+# First fenced code block in a completion, with or without a python language tag
+_FENCE_RE = re.compile(r"```(?:python)?\n?(.*?)```", re.DOTALL)
+
+# Async OpenAI client, bound to the app's shared HTTP client at startup
+_client: Optional[openai.AsyncOpenAI] = None
+
+
+def init_client(http_client: Optional[httpx.AsyncClient] = None) -> None:
+    """
+    Create the OpenAI client, reusing the given HTTP client's connection pool if provided.
+    """
+    global _client
+    _client = openai.AsyncOpenAI(api_key=settings.OPENAI_API_KEY, http_client=http_client)
+
+
+def get_client() -> openai.AsyncOpenAI:
+    if _client is None:
+        init_client()
+    return _client
+
+
+# Conversations live in Redis so every worker sees the same history:
+#   conv:{id}           orjson-encoded {user_id, created_at, context, context_json}
+#   conv:{id}:messages  list of orjson-encoded messages, capped at CONVERSATION_MAX_MESSAGES
+# Both keys expire CONVERSATION_TTL seconds after the last update.
+CONVERSATION_MAX_MESSAGES = 64
+
+# Per-conversation locks so concurrent turns of one conversation don't interleave
+_conversation_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+# Prefixes the error message yielded when a streamed reply fails after it has started
+STREAM_ERROR_MARKER = "\n\n[ERROR] "
+
+# Generated model code keyed on a BLAKE2b digest of the prompt, so regenerating
+# with unchanged inputs doesn't call the API again. The per-prompt locks make
+# concurrent identical requests share a single API call.
+_forecast_code_cache = TTLCache(maxsize=256, ttl=3600)
+_forecast_code_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+
+def _key_lock(locks: "weakref.WeakValueDictionary[str, asyncio.Lock]", key: str) -> asyncio.Lock:
+    lock = locks.get(key)
+    if lock is None:
+        lock = asyncio.Lock()
+        locks[key] = lock
+    return lock
+
+
+async def _save_conversation(conversation_id: str, conversation: Dict[str, Any]) -> None:
+    key = f"conv:{conversation_id}"
+    async with get_redis().pipeline(transaction=True) as pipe:
+        pipe.set(key, orjson.dumps(conversation), ex=settings.CONVERSATION_TTL)
+        pipe.expire(f"{key}:messages", settings.CONVERSATION_TTL)
+        await pipe.execute()
+
+
+async def _append_message(conversation_id: str, role: str, content: str) -> None:
+    key = f"conv:{conversation_id}:messages"
+    message = {
+        "role": role,
+        "content": content,
+        "timestamp": datetime.now().isoformat(),
+    }
+    async with get_redis().pipeline(transaction=True) as pipe:
+        pipe.rpush(key, orjson.dumps(message))
+        pipe.ltrim(key, -CONVERSATION_MAX_MESSAGES, -1)
+        pipe.expire(key, settings.CONVERSATION_TTL)
+        await pipe.execute()
+
+
+async def _open_completion(
+    messages: List[Dict[str, str]],
+    temperature: float,
+    max_tokens: int,
+) -> AsyncIterator[Any]:
+    """
+    Start a streamed chat completion. API errors (including failing to connect)
+    are raised here, before any text has been produced.
+    """
+    return await get_client().chat.completions.create(
+        model=settings.OPENAI_MODEL,
+        messages=messages,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        stream=True,
+    )
+
+
+async def _iter_deltas(stream: AsyncIterator[Any]) -> AsyncIterator[str]:
+    async for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
+
+async def _stream_completion(
+    messages: List[Dict[str, str]],
+    temperature: float,
+    max_tokens: int,
+) -> AsyncIterator[str]:
+    """
+    Stream a chat completion, yielding the text of each delta as it arrives.
+    """
+    stream = await _open_completion(messages, temperature, max_tokens)
+    async for delta in _iter_deltas(stream):
+        yield delta
 
 
 async def get_model_response(
@@ -36,34 +147,131 @@ async def get_model_response(
     # If no conversation ID is provided, create a new conversation
     if not conversation_id:
         conversation_id = str(uuid.uuid4())
-        conversations[conversation_id] = {
-            "user_id": user_id,
-            "messages": [],
-            "created_at": datetime.now().isoformat(),
-            "context": context or {},
-        }
     
+    async with _key_lock(_conversation_locks, conversation_id):
+        conversation, api_messages = await _start_turn(user_id, message, conversation_id, context)
+        
+        try:
+            # Call OpenAI API and collect the streamed reply
+            assistant_message = "".join([
+                delta async for delta in _stream_completion(api_messages, temperature=0.7, max_tokens=800)
+            ])
+            
+            # Add assistant message to conversation
+            await _append_message(conversation_id, "assistant", assistant_message)
+            
+            return {
+                "conversation_id": conversation_id,
+                "message": assistant_message,
+                "context": conversation["context"],
+            }
+            
+        except Exception as e:
+            error_message = await _record_error(conversation_id, e)
+            
+            return {
+                "conversation_id": conversation_id,
+                "error": error_message,
+                "context": conversation["context"],
+            }
+
+
+async def stream_model_response(
+    user_id: int,
+    message: str,
+    conversation_id: str,
+    context: Optional[Dict] = None
+) -> AsyncIterator[str]:
+    """
+    Start the LLM's response to a user message and return an iterator over its text.
+    
+    The turn is recorded and the API stream is opened before this returns, so a
+    failure to reach the API is raised to the caller (and recorded in the
+    conversation) while it can still become an error response. If the stream
+    fails part way through, the error is recorded and the iterator yields
+    STREAM_ERROR_MARKER followed by the error message as its last chunk. The full
+    reply is added to the conversation once the stream completes.
+    
+    Args:
+        user_id: The ID of the user
+        message: The user's message
+        conversation_id: The ID of the conversation
+        context: Additional context for the conversation (optional)
+        
+    Returns:
+        An async iterator over chunks of the assistant's response text
+    """
+    # The conversation stays locked until the returned iterator finishes
+    lock = _key_lock(_conversation_locks, conversation_id)
+    await lock.acquire()
+    try:
+        _, api_messages = await _start_turn(user_id, message, conversation_id, context)
+        try:
+            stream = await _open_completion(api_messages, temperature=0.7, max_tokens=800)
+        except Exception as e:
+            await _record_error(conversation_id, e)
+            raise
+    except BaseException:
+        lock.release()
+        raise
+    
+    return _relay_stream(stream, conversation_id, lock)
+
+
+async def _relay_stream(
+    stream: AsyncIterator[Any],
+    conversation_id: str,
+    lock: asyncio.Lock,
+) -> AsyncIterator[str]:
+    try:
+        reply = []
+        async for delta in _iter_deltas(stream):
+            reply.append(delta)
+            yield delta
+        
+        # Add assistant message to conversation
+        await _append_message(conversation_id, "assistant", "".join(reply))
+        
+    except Exception as e:
+        yield STREAM_ERROR_MARKER + await _record_error(conversation_id, e)
+    finally:
+        lock.release()
+
+
+async def _start_turn(
+    user_id: int,
+    message: str,
+    conversation_id: str,
+    context: Optional[Dict],
+) -> Tuple[Dict[str, Any], List[Dict[str, str]]]:
+    """
+    Record a user message and build the API messages for the reply.
+    Callers hold the conversation's lock.
+    
+    Returns:
+        A tuple containing (conversation, api_messages)
+    """
     # Get the conversation or create it if it doesn't exist
-    conversation = conversations.get(conversation_id)
-    if not conversation:
+    raw = await get_redis().get(f"conv:{conversation_id}")
+    if raw:
+        conversation = orjson.loads(raw)
+    else:
         conversation = {
             "user_id": user_id,
-            "messages": [],
             "created_at": datetime.now().isoformat(),
-            "context": context or {},
+            "context": {},
         }
-        conversations[conversation_id] = conversation
     
-    # Update context if provided
+    # Update context if provided; the serialized context is kept with the
+    # conversation so it is only re-encoded when the context changes
     if context:
         conversation["context"].update(context)
+    if context or "context_json" not in conversation:
+        conversation["context_json"] = orjson.dumps(conversation["context"]).decode()
     
     # Add user message to conversation
-    conversation["messages"].append({
-        "role": "user",
-        "content": message,
-        "timestamp": datetime.now().isoformat(),
-    })
+    await _append_message(conversation_id, "user", message)
+    await _save_conversation(conversation_id, conversation)
     
     # Prepare messages for the API
     api_messages = []
@@ -71,55 +279,26 @@ async def get_model_response(
     # Add system message with context
     system_message = "You are a financial forecasting assistant. You help users create, refine, and explore financial models and forecasts."
     if conversation["context"]:
-        system_message += f"\n\nContext: {json.dumps(conversation['context'])}"
+        system_message += f"\n\nContext: {conversation['context_json']}"
     
     api_messages.append({"role": "system", "content": system_message})
     
     # Add conversation history (limit to last 10 messages)
-    for msg in conversation["messages"][-10:]:
+    for raw_msg in await get_redis().lrange(f"conv:{conversation_id}:messages", -10, -1):
+        msg = orjson.loads(raw_msg)
         api_messages.append({"role": msg["role"], "content": msg["content"]})
     
-    try:
-        # Call OpenAI API
-        response = await openai.ChatCompletion.acreate(
-            model=settings.OPENAI_MODEL,
-            messages=api_messages,
-            temperature=0.7,
-            max_tokens=800,
-        )
-        
-        # Extract assistant message
-        assistant_message = response.choices[0].message.content
-        
-        # Add assistant message to conversation
-        conversation["messages"].append({
-            "role": "assistant",
-            "content": assistant_message,
-            "timestamp": datetime.now().isoformat(),
-        })
-        
-        return {
-            "conversation_id": conversation_id,
-            "message": assistant_message,
-            "context": conversation["context"],
-        }
-        
-    except Exception as e:
-        error_message = f"Error calling OpenAI API: {str(e)}"
-        print(error_message)
-        
-        # Add error message to conversation
-        conversation["messages"].append({
-            "role": "system",
-            "content": error_message,
-            "timestamp": datetime.now().isoformat(),
-        })
-        
-        return {
-            "conversation_id": conversation_id,
-            "error": error_message,
-            "context": conversation["context"],
-        }
+    return conversation, api_messages
+
+
+async def _record_error(conversation_id: str, error: Exception) -> str:
+    error_message = f"Error calling OpenAI API: {str(error)}"
+    logger.exception("Error calling OpenAI API")
+    
+    # Add error message to conversation
+    await _append_message(conversation_id, "system", error_message)
+    
+    return error_message
 
 
 async def generate_forecast_code(
@@ -168,32 +347,30 @@ The model should:
 
     # Add historical data and assumptions if provided
     if historical_data:
-        prompt += f"\nHistorical data: {json.dumps(historical_data)}"
+        prompt += f"\nHistorical data: {orjson.dumps(historical_data).decode()}"
     
     if assumptions:
-        prompt += f"\nAssumptions: {json.dumps(assumptions)}"
+        prompt += f"\nAssumptions: {orjson.dumps(assumptions).decode()}"
     
     prompt += "\nPlease provide clean, well-commented Python code only, without any explanations outside the code."
     
     api_messages.append({"role": "user", "content": prompt})
     
+    prompt_key = hashlib.blake2b(prompt.encode(), digest_size=16).hexdigest()
+    
     try:
-        # Call OpenAI API
-        response = await openai.ChatCompletion.acreate(
-            model=settings.OPENAI_MODEL,
-            messages=api_messages,
-            temperature=0.2,
-            max_tokens=2000,
-        )
-        
-        # Extract code from response
-        code = response.choices[0].message.content
-        
-        # Extract code from markdown if needed
-        if "```python" in code:
-            code = code.split("```python")[1].split("```")[0].strip()
-        elif "```" in code:
-            code = code.split("```")[1].split("```")[0].strip()
+        async with _key_lock(_forecast_code_locks, prompt_key):
+            code = _forecast_code_cache.get(prompt_key)
+            if code is None:
+                # Call OpenAI API and collect the streamed code
+                code = "".join([
+                    delta async for delta in _stream_completion(api_messages, temperature=0.2, max_tokens=2000)
+                ])
+                
+                # Extract code from markdown if needed
+                match = _FENCE_RE.search(code)
+                code = match.group(1).strip() if match else code.strip()
+                _forecast_code_cache[prompt_key] = code
         
         # Generate parameters based on model type and assumptions
         if assumptions:
@@ -204,8 +381,7 @@ The model should:
         return code, parameters
         
     except Exception as e:
-        error_message = f"Error generating model code: {str(e)}"
-        print(error_message)
+        logger.exception("Error generating model code")
         
         # Return a simple template with error message
         code = f"""
@@ -228,7 +404,18 @@ def generate_default_parameters(model_type: str) -> Dict[str, Any]:
         model_type: The type of financial model
         
     Returns:
-        A dictionary of default parameters
+        A new dictionary of default parameters that the caller may modify
+    """
+    return {
+        key: dict(value) if isinstance(value, Mapping) else value
+        for key, value in _default_template(model_type).items()
+    }
+
+
+@lru_cache(maxsize=8)
+def _default_template(model_type: str) -> Mapping[str, Any]:
+    """
+    Build the read-only default parameter template for a model type.
     """
     base_params = {
         "start_date": "2023-01-01",
@@ -236,7 +423,7 @@ def generate_default_parameters(model_type: str) -> Dict[str, Any]:
     }
     
     if model_type == "revenue":
-        return {
+        params = {
             **base_params,
             "initial_customers": 100,
             "monthly_growth_rate": 0.05,
@@ -245,7 +432,7 @@ def generate_default_parameters(model_type: str) -> Dict[str, Any]:
         }
     
     elif model_type == "expense":
-        return {
+        params = {
             **base_params,
             "fixed_costs": {
                 "rent": 5000,
@@ -266,7 +453,7 @@ def generate_default_parameters(model_type: str) -> Dict[str, Any]:
         }
     
     elif model_type == "cash_flow":
-        return {
+        params = {
             **base_params,
             "initial_cash": 100000,
             "monthly_revenue": 50000,
@@ -278,8 +465,13 @@ def generate_default_parameters(model_type: str) -> Dict[str, Any]:
         }
     
     else:
-        return {
+        params = {
             **base_params,
             "initial_value": 1000,
             "growth_rate": 0.02,
-        } 
\ No newline at end of file
+        }
+    
+    return MappingProxyType({
+        key: MappingProxyType(value) if isinstance(value, dict) else value
+        for key, value in params.items()
+    })
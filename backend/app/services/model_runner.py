@@ -1,23 +1,53 @@
-import ast
 import builtins
+import importlib
 import inspect
+import os
+import sys
 import traceback
 import pandas as pd
 import numpy as np
 import io
-import sys
-import matplotlib.pyplot as plt
+from functools import lru_cache, partial
+from types import ModuleType
 from typing import Dict, Any, Tuple, List, Optional
 
+# Default to a headless matplotlib backend (unless one is configured), picked up when pyplot is first imported
+os.environ.setdefault('MPLBACKEND', 'Agg')
+
+try:
+    from numba import njit
+except ImportError:  # numba is in requirements.txt; without it helpers run as plain Python
+    def njit(*args, **kwargs):
+        return lambda func: func
+
+class _LazyModule:
+    """
+    Stand-in for a module that is only imported on first attribute access, so heavy
+    optional libraries don't load (or use memory) until a model actually uses them.
+    """
+    
+    def __init__(self, name: str):
+        self._name = name
+        self._module: Optional[ModuleType] = None
+    
+    def __getattr__(self, attr: str) -> Any:
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+    
+    def __repr__(self) -> str:
+        return f"<lazy module '{self._name}'>"
+
+
 # List of allowed modules for sandboxing
 ALLOWED_MODULES = {
     'pandas': pd,
     'numpy': np,
     'math': __import__('math'),
     'datetime': __import__('datetime'),
-    'matplotlib.pyplot': plt,
-    'scipy': __import__('scipy'),
-    'statsmodels': __import__('statsmodels'),
+    'matplotlib.pyplot': _LazyModule('matplotlib.pyplot'),
+    'scipy': _LazyModule('scipy'),
+    'statsmodels': _LazyModule('statsmodels'),
 }
 
 # List of allowed builtins for sandboxing
@@ -45,12 +75,93 @@ ALLOWED_BUILTINS = {
     'print': print,
 }
 
+@njit(cache=True)
+def simulate_cash_flow(
+    initial_cash: float,
+    monthly_revenue: float,
+    monthly_expenses: float,
+    revenue_growth_rate: float,
+    expense_growth_rate: float,
+    collection_delay: int,
+    payment_delay: int,
+    investing_cash_flow: np.ndarray,
+    financing_cash_flow: np.ndarray,
+    periods: int,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Period-by-period cash flow simulation, available to model code that needs
+    iterative semantics. JIT-compiled (and cached on disk) when numba is installed.
+    
+    Args:
+        investing_cash_flow: Per-month investing flows (float64, length periods)
+        financing_cash_flow: Per-month financing flows (float64, length periods)
+        
+    Returns:
+        A tuple of (revenue, expenses, collections, payments, net_cash_flow, cash_balance)
+    """
+    revenue = np.empty(periods)
+    expenses = np.empty(periods)
+    collections = np.zeros(periods)  # stays zero until the delay has passed
+    payments = np.zeros(periods)
+    net_cash_flow = np.empty(periods)
+    cash_balance = np.empty(periods)
+    
+    for i in range(periods):
+        if i == 0:
+            revenue[i] = monthly_revenue
+            expenses[i] = monthly_expenses
+        else:
+            revenue[i] = revenue[i - 1] * (1 + revenue_growth_rate)
+            expenses[i] = expenses[i - 1] * (1 + expense_growth_rate)
+        
+        if i >= collection_delay:
+            collections[i] = revenue[i - collection_delay]
+        if i >= payment_delay:
+            payments[i] = expenses[i - payment_delay]
+        
+        net_cash_flow[i] = collections[i] - payments[i] + investing_cash_flow[i] + financing_cash_flow[i]
+        cash_balance[i] = initial_cash if i == 0 else cash_balance[i - 1] + net_cash_flow[i]
+    
+    return revenue, expenses, collections, payments, net_cash_flow, cash_balance
+
+
+# Helper functions exposed to model code
+MODEL_HELPERS = {
+    'simulate_cash_flow': simulate_cash_flow,
+}
+
+# Execution namespace shared by every run; run_model works on a shallow copy. Model
+# code executes with this single dict as both globals and locals, so functions and
+# comprehensions it defines can see its top-level names.
+_GLOBALS_TEMPLATE = {'__builtins__': builtins, **ALLOWED_MODULES, **ALLOWED_BUILTINS, **MODEL_HELPERS}
+
+
+@lru_cache(maxsize=128)
+def _compile(code: str):
+    """
+    Compile model code once; re-runs of the same code (e.g. parameter changes)
+    reuse the code object. Raises SyntaxError for invalid code.
+    """
+    return compile(code, '<model>', 'exec')
+
+
+def to_columnar(df: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Convert a DataFrame to the columnar result format:
+    {'columns': [...], 'data': {column: [values, ...]}}
+    """
+    return {'columns': list(df.columns), 'data': {col: df[col].tolist() for col in df.columns}}
+
 
 def run_model(code: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
     """
     Runs the financial model code with the provided parameters.
     Returns the model output which should be a dictionary.
     
+    The code stores its output in a 'result' dictionary. A DataFrame under
+    result['forecast_data'] is converted to the columnar format; any other
+    values must already be JSON-serializable.
+    
     Args:
         code: Python code to execute
         parameters: Dictionary of model parameters
@@ -58,47 +169,50 @@ def run_model(code: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
     Returns:
         Dictionary containing model results
     """
-    result = {}
     error = None
     figures = []
     
     # Create a secure execution environment
-    globals_dict = {**ALLOWED_MODULES}
-    locals_dict = {**ALLOWED_BUILTINS, 'parameters': parameters, 'result': result}
+    namespace = _GLOBALS_TEMPLATE.copy()
+    namespace['parameters'] = parameters
+    namespace['result'] = {}
     
-    # Redirect stdout to capture print statements
-    old_stdout = sys.stdout
-    new_stdout = io.StringIO()
-    sys.stdout = new_stdout
+    # Capture print statements by giving the model its own print bound to a buffer,
+    # rather than swapping the process-wide sys.stdout; skipped when the code never prints
+    output_buffer = io.StringIO() if 'print' in code else None
+    if output_buffer is not None:
+        namespace['print'] = partial(print, file=output_buffer)
     
     try:
-        # First, parse the code to catch syntax errors
-        ast.parse(code)
-        
-        # Execute the code
-        exec(code, globals_dict, locals_dict)
+        # Execute the code (compiling it on first use)
+        exec(_compile(code), namespace)
         
         # Get the result
-        result = locals_dict.get('result', {})
+        result = namespace['result']
         
         # Check if there are figures to convert to base64
-        figures = locals_dict.get('figures', [])
+        figures = namespace.get('figures', [])
         
-        # Convert any pandas DataFrames to dictionaries
-        for key, value in result.items():
-            if isinstance(value, pd.DataFrame):
-                result[key] = value.to_dict(orient='records')
+        # Convert the forecast DataFrame, if the code left one, to the columnar format
+        forecast_data = result.get('forecast_data')
+        if isinstance(forecast_data, pd.DataFrame):
+            result['forecast_data'] = to_columnar(forecast_data)
         
     except Exception as e:
+        result = {}
         error = {
             'type': str(type(e).__name__),
             'message': str(e),
             'traceback': traceback.format_exc()
         }
     finally:
-        # Restore stdout
-        sys.stdout = old_stdout
-        output = new_stdout.getvalue()
+        # Figures stay registered with pyplot until closed; close any the model created so
+        # repeated runs don't accumulate them (pyplot is not imported just to do this)
+        pyplot = sys.modules.get('matplotlib.pyplot')
+        if pyplot is not None:
+            pyplot.close('all')
+    
+    output = output_buffer.getvalue() if output_buffer is not None else ''
     
     # Add any console output and error info to the result
     if output:
@@ -140,74 +254,69 @@ def generate_revenue_model_template(prompt: str, parameters: Optional[Dict[str,
     return '''
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 from datetime import datetime, timedelta
 
-# Get parameters or use defaults
-params = parameters.copy()
-start_date = params.get('start_date', '2023-01-01')
-periods = params.get('periods', 36)  # 3 years by default
-initial_customers = params.get('initial_customers', 100)
-monthly_growth_rate = params.get('monthly_growth_rate', 0.05)  # 5% monthly growth
-average_revenue_per_customer = params.get('average_revenue_per_customer', 100)
-churn_rate = params.get('churn_rate', 0.02)  # 2% monthly churn
+# Default parameters, overridden by any provided parameters
+_DEFAULTS = {
+    'start_date': '2023-01-01',
+    'periods': 36,  # 3 years by default
+    'initial_customers': 100,
+    'monthly_growth_rate': 0.05,  # 5% monthly growth
+    'average_revenue_per_customer': 100,
+    'churn_rate': 0.02,  # 2% monthly churn
+}
+params = {**_DEFAULTS, **parameters}
+start_date, periods, initial_customers, monthly_growth_rate, average_revenue_per_customer, churn_rate = (
+    params['start_date'], params['periods'], params['initial_customers'],
+    params['monthly_growth_rate'], params['average_revenue_per_customer'], params['churn_rate'],
+)
 
 # Create date range
 date_range = pd.date_range(start=start_date, periods=periods, freq='M')
 
-# Initialize arrays
-customers = np.zeros(periods)
-new_customers = np.zeros(periods)
-lost_customers = np.zeros(periods)
-revenue = np.zeros(periods)
-
-# Set initial values
-customers[0] = initial_customers
-new_customers[0] = initial_customers
-revenue[0] = customers[0] * average_revenue_per_customer
-
-# Calculate values for each period
-for i in range(1, periods):
-    # New customers acquired
-    new_customers[i] = customers[i-1] * monthly_growth_rate
-    
-    # Customers lost to churn
-    lost_customers[i] = customers[i-1] * churn_rate
-    
-    # Net customers
-    customers[i] = customers[i-1] + new_customers[i] - lost_customers[i]
-    
-    # Revenue
-    revenue[i] = customers[i] * average_revenue_per_customer
-
-# Create a dataframe with the results
-df = pd.DataFrame({
-    'date': date_range,
-    'customers': customers,
-    'new_customers': new_customers,
-    'lost_customers': lost_customers,
-    'revenue': revenue,
-})
-
-# Create a plot for visualization
-plt.figure(figsize=(12, 6))
-plt.plot(df['date'], df['revenue'], label='Monthly Revenue')
-plt.title('Revenue Forecast')
-plt.xlabel('Date')
-plt.ylabel('Revenue ($)')
-plt.legend()
-plt.grid(True)
+# Customers compound by the net monthly growth (acquisition minus churn)
+growth = 1 + monthly_growth_rate - churn_rate
+customers = initial_customers * np.power(growth, np.arange(periods))
+
+# New customers acquired and customers lost to churn, based on the previous month
+new_customers = np.concatenate(([initial_customers], customers[:-1] * monthly_growth_rate))
+lost_customers = np.concatenate(([0.0], customers[:-1] * churn_rate))
+
+# Revenue
+revenue = customers * average_revenue_per_customer
+
+# Create a dataframe with the results: the numeric columns as one float block, then the date in front
+df = pd.DataFrame(
+    np.column_stack([customers, new_customers, lost_customers, revenue]),
+    columns=['customers', 'new_customers', 'lost_customers', 'revenue'],
+)
+df.insert(0, 'date', date_range)
+
+# Chart specs for visualization; rendering is left to the client
+dates = date_range.strftime('%Y-%m-%d').tolist()
+charts = [
+    {
+        'title': 'Revenue Forecast',
+        'x_label': 'Date',
+        'y_label': 'Revenue ($)',
+        'x': dates,
+        'series': [
+            {'name': 'Monthly Revenue', 'y': revenue.tolist()},
+        ],
+    },
+]
 
 # Create summary metrics
-total_revenue = df['revenue'].sum()
-max_monthly_revenue = df['revenue'].max()
-total_customers_acquired = df['new_customers'].sum()
-total_customers_lost = df['lost_customers'].sum()
-final_customer_count = df['customers'].iloc[-1]
+total_revenue = float(revenue.sum())
+max_monthly_revenue = float(revenue.max())
+total_customers_acquired = float(new_customers.sum())
+total_customers_lost = float(lost_customers.sum())
+final_customer_count = float(customers[-1])
 
 # Store results in the result dictionary
 result = {
-    'forecast_data': df.to_dict(orient='records'),
+    'charts': charts,
+    'forecast_data': {'columns': list(df.columns), 'data': {col: df[col].tolist() for col in df.columns}},
     'summary': {
         'total_revenue': total_revenue,
         'max_monthly_revenue': max_monthly_revenue,
@@ -224,85 +333,77 @@ def generate_expense_model_template(prompt: str, parameters: Optional[Dict[str,
     return '''
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 from datetime import datetime, timedelta
 
-# Get parameters or use defaults
-params = parameters.copy()
-start_date = params.get('start_date', '2023-01-01')
-periods = params.get('periods', 36)  # 3 years by default
-fixed_costs = params.get('fixed_costs', {
-    'rent': 5000,
-    'salaries': 20000,
-    'utilities': 1000,
-    'insurance': 1500,
-    'other_fixed': 2000
-})
-variable_costs = params.get('variable_costs', {
-    'marketing': 0.10,  # 10% of revenue
-    'sales_commission': 0.05,  # 5% of revenue
-    'customer_support': 0.03,  # 3% of revenue
-    'other_variable': 0.02,  # 2% of revenue
-})
-initial_revenue = params.get('initial_revenue', 50000)
-revenue_growth_rate = params.get('revenue_growth_rate', 0.03)  # 3% monthly growth
-inflation_rate = params.get('inflation_rate', 0.02 / 12)  # Annual inflation rate converted to monthly
+# Default parameters, overridden by any provided parameters
+_DEFAULTS = {
+    'start_date': '2023-01-01',
+    'periods': 36,  # 3 years by default
+    'fixed_costs': {
+        'rent': 5000,
+        'salaries': 20000,
+        'utilities': 1000,
+        'insurance': 1500,
+        'other_fixed': 2000
+    },
+    'variable_costs': {
+        'marketing': 0.10,  # 10% of revenue
+        'sales_commission': 0.05,  # 5% of revenue
+        'customer_support': 0.03,  # 3% of revenue
+        'other_variable': 0.02,  # 2% of revenue
+    },
+    'initial_revenue': 50000,
+    'revenue_growth_rate': 0.03,  # 3% monthly growth
+    'inflation_rate': 0.02 / 12,  # Annual inflation rate converted to monthly
+}
+params = {**_DEFAULTS, **parameters}
+start_date, periods, fixed_costs, variable_costs, initial_revenue, revenue_growth_rate, inflation_rate = (
+    params['start_date'], params['periods'], params['fixed_costs'], params['variable_costs'],
+    params['initial_revenue'], params['revenue_growth_rate'], params['inflation_rate'],
+)
 
 # Create date range
 date_range = pd.date_range(start=start_date, periods=periods, freq='M')
 
-# Initialize arrays
-revenue = np.zeros(periods)
-fixed_expenses = np.zeros(periods)
-variable_expenses = np.zeros(periods)
-total_expenses = np.zeros(periods)
+# Month index for compounding
+months = np.arange(periods)
 
-# Set initial values
-revenue[0] = initial_revenue
+# Revenue grows each month
+revenue = initial_revenue * (1 + revenue_growth_rate) ** months
 
-# Calculate initial fixed expenses (sum of all fixed costs)
+# Fixed expenses (sum of all fixed costs) increase with inflation
 initial_fixed_expenses = sum(fixed_costs.values())
-fixed_expenses[0] = initial_fixed_expenses
-
-# Calculate initial variable expenses
-initial_variable_expenses = sum([rate * revenue[0] for rate in variable_costs.values()])
-variable_expenses[0] = initial_variable_expenses
-total_expenses[0] = fixed_expenses[0] + variable_expenses[0]
-
-# Calculate values for each period
-for i in range(1, periods):
-    # Revenue grows each month
-    revenue[i] = revenue[i-1] * (1 + revenue_growth_rate)
-    
-    # Fixed expenses increase with inflation
-    fixed_expenses[i] = fixed_expenses[i-1] * (1 + inflation_rate)
-    
-    # Variable expenses as a percentage of revenue
-    variable_expenses[i] = sum([rate * revenue[i] for rate in variable_costs.values()])
-    
-    # Total expenses
-    total_expenses[i] = fixed_expenses[i] + variable_expenses[i]
-
-# Create a dataframe with the results
-df = pd.DataFrame({
-    'date': date_range,
-    'revenue': revenue,
-    'fixed_expenses': fixed_expenses,
-    'variable_expenses': variable_expenses,
-    'total_expenses': total_expenses,
-    'profit_loss': revenue - total_expenses
-})
-
-# Create a plot for visualization
-plt.figure(figsize=(12, 6))
-plt.plot(df['date'], df['total_expenses'], label='Total Expenses')
-plt.plot(df['date'], df['fixed_expenses'], label='Fixed Expenses')
-plt.plot(df['date'], df['variable_expenses'], label='Variable Expenses')
-plt.title('Expense Forecast')
-plt.xlabel('Date')
-plt.ylabel('Expenses ($)')
-plt.legend()
-plt.grid(True)
+fixed_expenses = initial_fixed_expenses * (1 + inflation_rate) ** months
+
+# Variable expenses as a percentage of revenue
+total_variable_rate = sum(variable_costs.values())
+variable_expenses = revenue * total_variable_rate
+
+# Total expenses
+total_expenses = fixed_expenses + variable_expenses
+
+# Create a dataframe with the results: the numeric columns as one float block, then the date in front
+df = pd.DataFrame(
+    np.column_stack([revenue, fixed_expenses, variable_expenses, total_expenses, revenue - total_expenses]),
+    columns=['revenue', 'fixed_expenses', 'variable_expenses', 'total_expenses', 'profit_loss'],
+)
+df.insert(0, 'date', date_range)
+
+# Chart specs for visualization; rendering is left to the client
+dates = date_range.strftime('%Y-%m-%d').tolist()
+charts = [
+    {
+        'title': 'Expense Forecast',
+        'x_label': 'Date',
+        'y_label': 'Expenses ($)',
+        'x': dates,
+        'series': [
+            {'name': 'Total Expenses', 'y': total_expenses.tolist()},
+            {'name': 'Fixed Expenses', 'y': fixed_expenses.tolist()},
+            {'name': 'Variable Expenses', 'y': variable_expenses.tolist()},
+        ],
+    },
+]
 
 # Create expense breakdown for the last period
 final_fixed_expenses = fixed_expenses[-1]
@@ -315,14 +416,15 @@ variable_breakdown = {name: rate * revenue[-1] for name, rate in variable_costs.
 
 # Store results in the result dictionary
 result = {
-    'forecast_data': df.to_dict(orient='records'),
+    'charts': charts,
+    'forecast_data': {'columns': list(df.columns), 'data': {col: df[col].tolist() for col in df.columns}},
     'expense_breakdown': {
         'fixed': fixed_breakdown,
         'variable': variable_breakdown
     },
     'summary': {
-        'total_expenses_sum': df['total_expenses'].sum(),
-        'average_monthly_expenses': df['total_expenses'].mean(),
+        'total_expenses_sum': float(total_expenses.sum()),
+        'average_monthly_expenses': float(total_expenses.mean()),
         'final_expense_ratio': total_expenses[-1] / revenue[-1] if revenue[-1] > 0 else 0,
     }
 }
@@ -334,141 +436,121 @@ def generate_cash_flow_model_template(prompt: str, parameters: Optional[Dict[str
     return '''
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 from datetime import datetime, timedelta
 
-# Get parameters or use defaults
-params = parameters.copy()
-start_date = params.get('start_date', '2023-01-01')
-periods = params.get('periods', 36)  # 3 years by default
-initial_cash = params.get('initial_cash', 100000)
-monthly_revenue = params.get('monthly_revenue', 50000)
-revenue_growth_rate = params.get('revenue_growth_rate', 0.03)  # 3% monthly growth
-collection_delay = params.get('collection_delay', 1)  # Months to collect revenue
-monthly_expenses = params.get('monthly_expenses', 40000)
-expense_growth_rate = params.get('expense_growth_rate', 0.02)  # 2% monthly growth
-payment_delay = params.get('payment_delay', 0)  # Months to pay expenses
-investments = params.get('investments', [])  # List of (month, amount) tuples
-financing = params.get('financing', [])  # List of (month, amount) tuples
-loan_payments = params.get('loan_payments', [])  # List of (month, amount) tuples
+# Default parameters, overridden by any provided parameters
+_DEFAULTS = {
+    'start_date': '2023-01-01',
+    'periods': 36,  # 3 years by default
+    'initial_cash': 100000,
+    'monthly_revenue': 50000,
+    'revenue_growth_rate': 0.03,  # 3% monthly growth
+    'collection_delay': 1,  # Months to collect revenue
+    'monthly_expenses': 40000,
+    'expense_growth_rate': 0.02,  # 2% monthly growth
+    'payment_delay': 0,  # Months to pay expenses
+    'investments': [],  # List of (month, amount) tuples
+    'financing': [],  # List of (month, amount) tuples
+    'loan_payments': [],  # List of (month, amount) tuples
+}
+params = {**_DEFAULTS, **parameters}
+(start_date, periods, initial_cash, monthly_revenue, revenue_growth_rate, collection_delay,
+ monthly_expenses, expense_growth_rate, payment_delay, investments, financing, loan_payments) = (
+    params['start_date'], params['periods'], params['initial_cash'], params['monthly_revenue'],
+    params['revenue_growth_rate'], params['collection_delay'], params['monthly_expenses'],
+    params['expense_growth_rate'], params['payment_delay'], params['investments'],
+    params['financing'], params['loan_payments'],
+)
 
 # Create date range
 date_range = pd.date_range(start=start_date, periods=periods, freq='M')
 
-# Initialize arrays
-cash_balance = np.zeros(periods)
-revenue = np.zeros(periods)
-expenses = np.zeros(periods)
-collections = np.zeros(periods)
-payments = np.zeros(periods)
-investing_cash_flow = np.zeros(periods)
-financing_cash_flow = np.zeros(periods)
-net_cash_flow = np.zeros(periods)
+# Month index for compounding
+months = np.arange(periods)
+
+# Revenue and expenses grow each month
+revenue = monthly_revenue * (1 + revenue_growth_rate) ** months
+expenses = monthly_expenses * (1 + expense_growth_rate) ** months
 
-# Set initial values
-cash_balance[0] = initial_cash
-revenue[0] = monthly_revenue
-expenses[0] = monthly_expenses
+# Collect revenue and pay expenses with delay (nothing flows before the delay has passed)
+collections = np.empty(periods)
+collections[:collection_delay] = 0
+collections[collection_delay:] = revenue[:max(periods - collection_delay, 0)]
+payments = np.empty(periods)
+payments[:payment_delay] = 0
+payments[payment_delay:] = expenses[:max(periods - payment_delay, 0)]
 
-# If collection delay is 0, collect immediately
-if collection_delay == 0:
-    collections[0] = revenue[0]
-# If payment delay is 0, pay immediately
-if payment_delay == 0:
-    payments[0] = expenses[0]
+# Add investments and financing in the month they occur
+investing_cash_flow = np.zeros(periods)
+financing_cash_flow = np.zeros(periods)
 
-# Add initial investments and financing if any
 for month, amount in investments:
-    if month == 0:
-        investing_cash_flow[0] -= amount  # Negative because it's an outflow
-        
-for month, amount in financing:
-    if month == 0:
-        financing_cash_flow[0] += amount
-        
-for month, amount in loan_payments:
-    if month == 0:
-        financing_cash_flow[0] -= amount  # Negative because it's an outflow
+    if 0 <= month < periods:
+        investing_cash_flow[int(month)] -= amount  # Negative because it's an outflow
 
-# Calculate net cash flow for the first period
-net_cash_flow[0] = collections[0] - payments[0] + investing_cash_flow[0] + financing_cash_flow[0]
+for month, amount in financing:
+    if 0 <= month < periods:
+        financing_cash_flow[int(month)] += amount
 
-# Calculate values for each period
-for i in range(1, periods):
-    # Revenue and expenses grow each month
-    revenue[i] = revenue[i-1] * (1 + revenue_growth_rate)
-    expenses[i] = expenses[i-1] * (1 + expense_growth_rate)
-    
-    # Collect revenue with delay
-    if i >= collection_delay:
-        collections[i] = revenue[i - collection_delay]
-    
-    # Pay expenses with delay
-    if i >= payment_delay:
-        payments[i] = expenses[i - payment_delay]
-    
-    # Add investments and financing
-    for month, amount in investments:
-        if month == i:
-            investing_cash_flow[i] -= amount
-            
-    for month, amount in financing:
-        if month == i:
-            financing_cash_flow[i] += amount
-            
-    for month, amount in loan_payments:
-        if month == i:
-            financing_cash_flow[i] -= amount
-    
-    # Net cash flow
-    net_cash_flow[i] = collections[i] - payments[i] + investing_cash_flow[i] + financing_cash_flow[i]
-    
-    # Cash balance
-    cash_balance[i] = cash_balance[i-1] + net_cash_flow[i]
-
-# Create a dataframe with the results
-df = pd.DataFrame({
-    'date': date_range,
-    'cash_balance': cash_balance,
-    'revenue': revenue,
-    'expenses': expenses,
-    'collections': collections,
-    'payments': payments,
-    'investing_cash_flow': investing_cash_flow,
-    'financing_cash_flow': financing_cash_flow,
-    'net_cash_flow': net_cash_flow
-})
-
-# Create a plot for visualization
-plt.figure(figsize=(12, 6))
-plt.plot(df['date'], df['cash_balance'], label='Cash Balance')
-plt.title('Cash Flow Forecast')
-plt.xlabel('Date')
-plt.ylabel('Cash ($)')
-plt.legend()
-plt.grid(True)
-
-# Create another plot for cash flows
-plt.figure(figsize=(12, 6))
-plt.plot(df['date'], df['net_cash_flow'], label='Net Cash Flow')
-plt.plot(df['date'], df['collections'], label='Collections')
-plt.plot(df['date'], df['payments'], label='Payments')
-plt.title('Cash Flow Components')
-plt.xlabel('Date')
-plt.ylabel('Amount ($)')
-plt.legend()
-plt.grid(True)
+for month, amount in loan_payments:
+    if 0 <= month < periods:
+        financing_cash_flow[int(month)] -= amount  # Negative because it's an outflow
+
+# Net cash flow
+net_cash_flow = collections - payments + investing_cash_flow + financing_cash_flow
+
+# Cash balance, starting from the initial cash in the first month
+cash_balance = initial_cash + np.concatenate(([0.0], np.cumsum(net_cash_flow[1:])))
+
+# Create a dataframe with the results: the numeric columns as one float block, then the date in front
+df = pd.DataFrame(
+    np.column_stack([
+        cash_balance, revenue, expenses, collections, payments,
+        investing_cash_flow, financing_cash_flow, net_cash_flow,
+    ]),
+    columns=[
+        'cash_balance', 'revenue', 'expenses', 'collections', 'payments',
+        'investing_cash_flow', 'financing_cash_flow', 'net_cash_flow',
+    ],
+)
+df.insert(0, 'date', date_range)
+
+# Chart specs for visualization; rendering is left to the client
+dates = date_range.strftime('%Y-%m-%d').tolist()
+charts = [
+    {
+        'title': 'Cash Flow Forecast',
+        'x_label': 'Date',
+        'y_label': 'Cash ($)',
+        'x': dates,
+        'series': [
+            {'name': 'Cash Balance', 'y': cash_balance.tolist()},
+        ],
+    },
+    {
+        'title': 'Cash Flow Components',
+        'x_label': 'Date',
+        'y_label': 'Amount ($)',
+        'x': dates,
+        'series': [
+            {'name': 'Net Cash Flow', 'y': net_cash_flow.tolist()},
+            {'name': 'Collections', 'y': collections.tolist()},
+            {'name': 'Payments', 'y': payments.tolist()},
+        ],
+    },
+]
 
 # Store results in the result dictionary
 result = {
-    'forecast_data': df.to_dict(orient='records'),
+    'charts': charts,
+    'forecast_data': {'columns': list(df.columns), 'data': {col: df[col].tolist() for col in df.columns}},
     'summary': {
-        'min_cash_balance': df['cash_balance'].min(),
-        'max_cash_balance': df['cash_balance'].max(),
-        'final_cash_balance': df['cash_balance'].iloc[-1],
-        'total_collections': df['collections'].sum(),
-        'total_payments': df['payments'].sum(),
-        'total_net_cash_flow': df['net_cash_flow'].sum(),
+        'min_cash_balance': float(cash_balance.min()),
+        'max_cash_balance': float(cash_balance.max()),
+        'final_cash_balance': float(cash_balance[-1]),
+        'total_collections': float(collections.sum()),
+        'total_payments': float(payments.sum()),
+        'total_net_cash_flow': float(net_cash_flow.sum()),
     }
 }
 '''
@@ -479,50 +561,55 @@ def generate_custom_model_template(model_type: str, prompt: str, parameters: Opt
     return '''
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 from datetime import datetime, timedelta
 
-# Get parameters or use defaults
-params = parameters.copy()
-start_date = params.get('start_date', '2023-01-01')
-periods = params.get('periods', 36)  # 3 years by default
+# Default parameters, overridden by any provided parameters
+_DEFAULTS = {
+    'start_date': '2023-01-01',
+    'periods': 36,  # 3 years by default
+    'growth_rate': 0.02,  # 2% monthly growth
+    'initial_value': 1000,
+}
+params = {**_DEFAULTS, **parameters}
+start_date, periods, growth_rate, initial_value = (
+    params['start_date'], params['periods'], params['growth_rate'], params['initial_value'],
+)
 
 # Create date range
 date_range = pd.date_range(start=start_date, periods=periods, freq='M')
 
-# Initialize arrays for our model
-values = np.zeros(periods)
-growth_rate = params.get('growth_rate', 0.02)  # 2% monthly growth
-
-# Set initial value
-values[0] = params.get('initial_value', 1000)
-
-# Calculate values for each period
-for i in range(1, periods):
-    values[i] = values[i-1] * (1 + growth_rate)
-
-# Create a dataframe with the results
-df = pd.DataFrame({
-    'date': date_range,
-    'value': values,
-})
-
-# Create a plot for visualization
-plt.figure(figsize=(12, 6))
-plt.plot(df['date'], df['value'], label='Forecast')
-plt.title('Custom Forecast Model')
-plt.xlabel('Date')
-plt.ylabel('Value')
-plt.legend()
-plt.grid(True)
+# Compound the initial value for each period
+values = initial_value * (1 + growth_rate) ** np.arange(periods)
+
+# Create a dataframe with the results: the numeric columns as one float block, then the date in front
+df = pd.DataFrame(
+    np.column_stack([values]),
+    columns=['value'],
+)
+df.insert(0, 'date', date_range)
+
+# Chart specs for visualization; rendering is left to the client
+dates = date_range.strftime('%Y-%m-%d').tolist()
+charts = [
+    {
+        'title': 'Custom Forecast Model',
+        'x_label': 'Date',
+        'y_label': 'Value',
+        'x': dates,
+        'series': [
+            {'name': 'Forecast', 'y': values.tolist()},
+        ],
+    },
+]
 
 # Store results in the result dictionary
 result = {
-    'forecast_data': df.to_dict(orient='records'),
+    'charts': charts,
+    'forecast_data': {'columns': list(df.columns), 'data': {col: df[col].tolist() for col in df.columns}},
     'summary': {
-        'total_value': df['value'].sum(),
-        'average_value': df['value'].mean(),
-        'final_value': df['value'].iloc[-1],
+        'total_value': float(values.sum()),
+        'average_value': float(values.mean()),
+        'final_value': float(values[-1]),
     }
 }
 ''' 
\ No newline at end of file
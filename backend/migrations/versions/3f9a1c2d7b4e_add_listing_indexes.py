@@ -0,0 +1,41 @@
+"""add listing indexes
+
+Revision ID: 3f9a1c2d7b4e
+Revises: 1a2b3c4d5e6f
+Create Date: 2026-10-15 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f9a1c2d7b4e'
+down_revision = '1a2b3c4d5e6f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_data_sources_owner_source",
+        "data_sources",
+        ["owner_id", "source_type"],
+    )
+    op.create_index(
+        "ix_financial_models_owner_public_type",
+        "financial_models",
+        ["owner_id", "is_public", "model_type"],
+    )
+    op.create_index(
+        "ix_model_versions_model_version",
+        "model_versions",
+        ["model_id", "version_number"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_model_versions_model_version", table_name="model_versions")
+    op.drop_index("ix_financial_models_owner_public_type", table_name="financial_models")
+    op.drop_index("ix_data_sources_owner_source", table_name="data_sources")
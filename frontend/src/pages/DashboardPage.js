@@ -39,8 +39,8 @@ const DashboardPage = () => {
     const fetchModels = async () => {
       try {
         setLoading(true);
-        const data = await getModels(null, 1, 4); // Get first 4 models
-        setModels(data);
+        const data = await getModels(null, null, 4); // Get first 4 models
+        setModels(data.items);
       } catch (err) {
         console.error('Error fetching models:', err);
         setError('Failed to load models. Please try again later.');
@@ -1,10 +1,13 @@
 import api from './api';
 
-export const getDataSources = async (type = null, page = 1, limit = 10) => {
-  const params = { skip: (page - 1) * limit, limit };
+export const getDataSources = async (type = null, afterId = null, limit = 10) => {
+  const params = { limit };
   if (type) {
     params.source_type = type;
   }
+  if (afterId !== null) {
+    params.after_id = afterId;
+  }
   
   const response = await api.get('/data-sources', { params });
   return response.data;
@@ -52,4 +55,9 @@ export const uploadFileData = async (file, name, sourceType, description = '') =
 export const importDataFromSource = async (sourceId) => {
   const response = await api.post(`/data-sources/${sourceId}/import`);
   return response.data;
-}; 
\ No newline at end of file
+}; 
+export const getImportJob = async (jobId, page = 1, limit = 100) => {
+  const params = { skip: (page - 1) * limit, limit };
+  const response = await api.get(`/data-sources/import-jobs/${jobId}`, { params });
+  return response.data;
+};
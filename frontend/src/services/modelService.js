@@ -1,11 +1,14 @@
 import api from './api';
 
-export const getModels = async (type = null, page = 1, limit = 10) => {
+export const getModels = async (type = null, afterId = null, limit = 10) => {
   let url = '/models';
-  const params = { skip: (page - 1) * limit, limit };
+  const params = { limit };
   if (type) {
     params.model_type = type;
   }
+  if (afterId !== null) {
+    params.after_id = afterId;
+  }
   
   const response = await api.get(url, { params });
   return response.data;